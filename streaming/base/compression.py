@@ -5,8 +5,9 @@
 
 import bz2
 import gzip
+import zlib
 from abc import ABC, abstractmethod
-from typing import Dict, Iterator, Optional, Set, Tuple, Type
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple, Type, Union
 
 import brotli
 import snappy
@@ -14,7 +15,8 @@ import zstd
 from typing_extensions import Self
 
 __all__ = [
-    'compress', 'decompress', 'get_compression_extension', 'get_compressions', 'is_compression'
+    'compress', 'decompress', 'decompress_chunks', 'get_compression_extension', 'get_compressions',
+    'is_compression', 'is_incremental'
 ]
 
 
@@ -22,6 +24,7 @@ class Compression(ABC):
     """A compression algorithm family."""
 
     extension: str = ''  # Filename extension.
+    incremental: bool = False  # Whether decompress_chunks() decodes without gathering the input.
 
     @classmethod
     def each(cls) -> Iterator[Tuple[str, Self]]:
@@ -45,17 +48,65 @@ class Compression(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def decompress(self, data: bytes) -> bytes:
+    def decompress(self, data: Union[bytes, memoryview]) -> bytes:
         """Decompress data compressed by this algorithm.
 
         Args:
-            data (bytes): Compressed data.
+            data (Union[bytes, memoryview]): Compressed data.
 
         Returns:
             bytes: Decompressed data.
         """
         raise NotImplementedError
 
+    def decompress_chunks(self, chunks: Iterable[Union[bytes, memoryview]]) -> Iterator[bytes]:
+        """Decompress a stream of compressed data incrementally.
+
+        By default, this gathers the whole input and decompresses it at once. Algorithms with
+        incremental decoders override it to keep memory bounded by the chunk size.
+
+        Args:
+            chunks (Iterable[Union[bytes, memoryview]]): Compressed data, in order.
+
+        Returns:
+            Iterator[bytes]: Decompressed data, in order.
+        """
+        yield self.decompress(b''.join(chunks))
+
+
+def _decompress_members(chunks: Iterable[Union[bytes, memoryview]],
+                        new_decompressor: Callable[[], Any],
+                        error: str,
+                        padding: bytes = b'') -> Iterator[bytes]:
+    """Incrementally decompress concatenated members (gzip members or bzip2 streams).
+
+    Args:
+        chunks (Iterable[Union[bytes, memoryview]]): Compressed data, in order.
+        new_decompressor (Callable[[], Any]): Creates a decompressor for one member, exposing
+            ``decompress``, ``eof`` and ``unused_data``.
+        error (str): Message of the error raised if the data ends within a member.
+        padding (bytes): Filler byte skipped between members. Defaults to ``b''``.
+
+    Returns:
+        Iterator[bytes]: Decompressed data, in order.
+    """
+    obj = None
+    for chunk in chunks:
+        while chunk:
+            if obj is None:
+                if padding and chunk[:1] == padding:
+                    chunk = bytes(chunk).lstrip(padding)
+                    if not chunk:
+                        break
+                obj = new_decompressor()
+            yield obj.decompress(chunk)
+            if not obj.eof:
+                break
+            chunk = obj.unused_data
+            obj = None
+    if obj is not None:
+        raise EOFError(error)
+
 
 class LevelledCompression(Compression):
     """Compression with levels.
@@ -80,6 +131,7 @@ class Brotli(LevelledCompression):
     """Brotli compression."""
 
     extension = 'br'
+    incremental = True
     levels = list(range(12))
 
     def __init__(self, level: int = 11) -> None:
@@ -89,14 +141,22 @@ class Brotli(LevelledCompression):
     def compress(self, data: bytes) -> bytes:
         return brotli.compress(data, quality=self.level)
 
-    def decompress(self, data: bytes) -> bytes:
+    def decompress(self, data: Union[bytes, memoryview]) -> bytes:
         return brotli.decompress(data)
 
+    def decompress_chunks(self, chunks: Iterable[Union[bytes, memoryview]]) -> Iterator[bytes]:
+        obj = brotli.Decompressor()
+        for chunk in chunks:
+            yield obj.process(chunk)
+        if not obj.is_finished():
+            raise brotli.error('Compressed data ended before the end of the stream')
+
 
 class Bzip2(LevelledCompression):
     """Bzip2 compression."""
 
     extension = 'bz2'
+    incremental = True
     levels = list(range(1, 10))
 
     def __init__(self, level: int = 9) -> None:
@@ -106,15 +166,22 @@ class Bzip2(LevelledCompression):
     def compress(self, data: bytes) -> bytes:
         return bz2.compress(data, self.level)
 
-    def decompress(self, data: bytes) -> bytes:
+    def decompress(self, data: Union[bytes, memoryview]) -> bytes:
         return bz2.decompress(data)
 
+    def decompress_chunks(self, chunks: Iterable[Union[bytes, memoryview]]) -> Iterator[bytes]:
+        return _decompress_members(
+            chunks, bz2.BZ2Decompressor,
+            'Compressed file ended before the end-of-stream marker was reached')
+
 
 class Gzip(LevelledCompression):
     """Gzip compression."""
 
     extension = 'gz'
+    incremental = True
     levels = list(range(10))
+    _wbits = 16 + zlib.MAX_WBITS  # zlib window bits selecting the gzip container.
 
     def __init__(self, level: int = 9) -> None:
         assert level in self.levels
@@ -123,8 +190,16 @@ class Gzip(LevelledCompression):
     def compress(self, data: bytes) -> bytes:
         return gzip.compress(data, self.level)
 
-    def decompress(self, data: bytes) -> bytes:
-        return gzip.decompress(data)
+    def decompress(self, data: Union[bytes, memoryview]) -> bytes:
+        return b''.join(self.decompress_chunks([data]))
+
+    def decompress_chunks(self, chunks: Iterable[Union[bytes, memoryview]]) -> Iterator[bytes]:
+        # Inflate each gzip member with zlib directly (header and CRC are checked in C), instead of
+        # gzip.decompress, which parses headers in Python and copies the input for each member.
+        # Like gzip.decompress, this skips zero padding between and after members.
+        return _decompress_members(
+            chunks, lambda: zlib.decompressobj(self._wbits),
+            'Compressed file ended before the end-of-stream marker was reached', b'\0')
 
 
 class Snappy(Compression):
@@ -135,7 +210,7 @@ class Snappy(Compression):
     def compress(self, data: bytes) -> bytes:
         return snappy.compress(data)
 
-    def decompress(self, data: bytes) -> bytes:
+    def decompress(self, data: Union[bytes, memoryview]) -> bytes:
         return snappy.decompress(data)
 
 
@@ -152,8 +227,9 @@ class Zstandard(LevelledCompression):
     def compress(self, data: bytes) -> bytes:
         return zstd.compress(data, self.level)
 
-    def decompress(self, data: bytes) -> bytes:
-        return zstd.decompress(data)
+    def decompress(self, data: Union[bytes, memoryview]) -> bytes:
+        # The zstd binding only accepts bytes.
+        return zstd.decompress(data if isinstance(data, bytes) else bytes(data))
 
 
 # Compression algorithm families (extension -> class).
@@ -207,6 +283,23 @@ def is_compression(algo: Optional[str]) -> bool:
     return algo in _algorithms
 
 
+def is_incremental(algo: Optional[str]) -> bool:
+    """Get whether this compression algorithm decompresses chunks without gathering the input.
+
+    Args:
+        algo (str, optional): Compression.
+
+    Returns:
+        bool: Whether incremental.
+    """
+    if algo is None:
+        return True
+    if not is_compression(algo):
+        raise ValueError(f'{algo} is not a supported compression algorithm.')
+    obj = _algorithms[algo]
+    return obj.incremental
+
+
 def get_compression_extension(algo: str) -> str:
     """Get compressed filename extension.
 
@@ -240,19 +333,37 @@ def compress(algo: Optional[str], data: bytes) -> bytes:
     return obj.compress(data)
 
 
-def decompress(algo: Optional[str], data: bytes) -> bytes:
+def decompress(algo: Optional[str], data: Union[bytes, memoryview]) -> bytes:
     """Decompress data compressed by this algorithm.
 
     Args:
         algo (str, optional): Compression.
-        data (bytes): Compressed data.
+        data (Union[bytes, memoryview]): Compressed data.
 
     Returns:
         bytes: Decompressed data.
     """
     if algo is None:
-        return data
+        return bytes(data)
     if not is_compression(algo):
         raise ValueError(f'{algo} is not a supported compression algorithm.')
     obj = _algorithms[algo]
     return obj.decompress(data)
+
+
+def decompress_chunks(algo: Optional[str], chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Decompress a stream of data compressed by this algorithm, incrementally where supported.
+
+    Args:
+        algo (str, optional): Compression.
+        chunks (Iterable[bytes]): Compressed data, in order.
+
+    Returns:
+        Iterator[bytes]: Decompressed data, in order.
+    """
+    if algo is None:
+        return iter(chunks)
+    if not is_compression(algo):
+        raise ValueError(f'{algo} is not a supported compression algorithm.')
+    obj = _algorithms[algo]
+    return obj.decompress_chunks(chunks)
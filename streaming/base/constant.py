@@ -31,3 +31,10 @@ CACHE_FILELOCK = 'cache_filelock'
 
 # Time to wait, in seconds.
 TICK = 0.007
+
+# Size, in bytes, of the reads used to stream shard files through hashing and decompression.
+FILE_CHUNK_SIZE = 1 << 20
+
+# Delay, in seconds, before the first download retry, doubling per retry up to the max.
+DOWNLOAD_BACKOFF_BASE = 0.25
+DOWNLOAD_BACKOFF_MAX = 8.0
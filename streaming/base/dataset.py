@@ -672,6 +672,7 @@ class StreamingDataset(Array, IterableDataset):
             samples_per_stream_shard = self.samples_per_shard[stream_shard_ids]
             stream_samples = sum(samples_per_stream_shard)
             stream_choose = self.streams[stream_id].choose
+            assert stream_choose is not None  # Derived by Stream.apply_weights.
             if stream_choose == stream_samples:
                 choose_per_stream_shard = samples_per_stream_shard
             else:
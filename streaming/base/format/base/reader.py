@@ -99,9 +99,9 @@ class Reader(Array, ABC):
         """Bring what shard files are present to a consistent state, returning whether present.
 
         Args:
-            filenames_present (Set[str]): The listing of all files under dirname/[split/]. This is
-                listed once and then saved because there could potentially be very many shard
-                files.
+            filenames_present (Set[str]): The listing of all files under dirname/[split/], as
+                paths relative to it (ie, shard file basenames). This is listed once and then saved
+                because there could potentially be very many shard files.
             keep_zip (bool): Whether to keep zip files when decompressing. Possible when
                 compression was used. Necessary when local is the remote or there is no remote.
 
@@ -112,14 +112,10 @@ class Reader(Array, ABC):
         raw_files_present = 0
         zip_files_present = 0
         for raw_info, zip_info in self.file_pairs:
-            if raw_info:
-                filename = os.path.join(self.dirname, self.split, raw_info.basename)
-                if filename in filenames_present:
-                    raw_files_present += 1
-            if zip_info:
-                filename = os.path.join(self.dirname, self.split, zip_info.basename)
-                if filename in filenames_present:
-                    zip_files_present += 1
+            if raw_info and raw_info.basename in filenames_present:
+                raw_files_present += 1
+            if zip_info and zip_info.basename in filenames_present:
+                zip_files_present += 1
 
         # If the shard raw files are partially present, garbage collect the present ones and mark
         # the shard raw as not present, in order to achieve consistency.
@@ -5,7 +5,6 @@
 
 import json
 import os
-from copy import deepcopy
 from typing import Any, Dict, List, Optional
 
 import numpy as np
@@ -68,7 +67,7 @@ class JSONReader(SplitReader):
         Returns:
             Self: Loaded JSONReader.
         """
-        args = deepcopy(obj)
+        args = dict(obj)
         # Version check.
         if args['version'] != 2:
             raise ValueError(
@@ -4,7 +4,6 @@
 """:class:`MDSReader` reads samples in `.mds` files written by :class:`StreamingDatasetWriter`."""
 
 import os
-from copy import deepcopy
 from typing import Any, Dict, List, Optional
 
 import numpy as np
@@ -66,7 +65,7 @@ class MDSReader(JointReader):
         Returns:
             Self: Loaded MDSReader.
         """
-        args = deepcopy(obj)
+        args = dict(obj)
         if args['version'] != 2:
             raise ValueError(
                 f'Unsupported streaming data version: {args["version"]}. Expected version 2.'
@@ -4,7 +4,6 @@
 """Reads and decode samples from tabular formatted files such as XSV, CSV, and TSV."""
 
 import os
-from copy import deepcopy
 from typing import Any, Dict, List, Optional
 
 import numpy as np
@@ -73,7 +72,7 @@ class XSVReader(SplitReader):
         Returns:
             Self: Loaded XSVReader.
         """
-        args = deepcopy(obj)
+        args = dict(obj)
         if args['version'] != 2:
             raise ValueError(
                 f'Unsupported streaming data version: {args["version"]}. Expected version 2.'
@@ -186,7 +185,7 @@ class CSVReader(XSVReader):
         Returns:
             Self: Loaded CSVReader.
         """
-        args = deepcopy(obj)
+        args = dict(obj)
         if args['version'] != 2:
             raise ValueError(
                 f'Unsupported streaming data version: {args["version"]}. Expected version 2.'
@@ -259,7 +258,7 @@ class TSVReader(XSVReader):
         Returns:
             Self: Loaded TSVReader.
         """
-        args = deepcopy(obj)
+        args = dict(obj)
         if args['version'] != 2:
             raise ValueError(
                 f'Unsupported streaming data version: {args["version"]}. Expected version 2.'
@@ -4,18 +4,20 @@
 """Setter and Getter for support hashing algorithms."""
 
 import hashlib
+import mmap
+import os
 from typing import Any, Callable, Dict, Set
 
 import xxhash
 
-__all__ = ['get_hash', 'get_hashes', 'is_hash']
+__all__ = ['get_file_hash', 'get_hash', 'get_hasher', 'get_hashes', 'is_hash']
 
 
-def _collect() -> Dict[str, Callable[[bytes], Any]]:
+def _collect() -> Dict[str, Callable[..., Any]]:
     """Get all supported hash algorithms.
 
     Returns:
-        Dict[str, Callable[[bytes], Any]]: Mapping of name to hash.
+        Dict[str, Callable[..., Any]]: Mapping of name to hash.
     """
     hashes = {
         algo: getattr(hashlib, algo)
@@ -67,3 +69,48 @@ def get_hash(algo: str, data: bytes) -> str:
         raise ValueError(f'{algo} is not a supported hash algorithm.')
     func = _hashes[algo]
     return func(data).hexdigest()
+
+
+def get_hasher(algo: str) -> Any:
+    """Create an incremental hasher, to be fed with ``update()`` and read with ``hexdigest()``.
+
+    Args:
+        algo (str): Hash algorithm.
+
+    Returns:
+        Any: Fresh hash object.
+    """
+    if not is_hash(algo):
+        raise ValueError(f'{algo} is not a supported hash algorithm.')
+    func = _hashes[algo]
+    return func()
+
+
+def get_file_hash(algo: str, filename: str) -> str:
+    """Apply the hash algorithm to the contents of a file.
+
+    The file is memory-mapped (pre-faulted with ``MAP_POPULATE`` where supported) and hashed
+    straight from the page cache, instead of being read into a bytes object first.
+
+    Args:
+        algo (str): Hash algorithm.
+        filename (str): File to hash.
+
+    Returns:
+        str: Hex digest.
+    """
+    if not is_hash(algo):
+        raise ValueError(f'{algo} is not a supported hash algorithm.')
+    func = _hashes[algo]
+    with open(filename, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:  # Empty files cannot be mapped.
+            return func(b'').hexdigest()
+        if os.name == 'nt':
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            flags = mmap.MAP_SHARED | getattr(mmap, 'MAP_POPULATE', 0)
+            data = mmap.mmap(file.fileno(), 0, flags, mmap.PROT_READ)
+        try:
+            return func(data).hexdigest()
+        finally:
+            data.close()
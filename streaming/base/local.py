@@ -3,11 +3,11 @@
 
 """A non-streaming pytorch map Dataset."""
 
-import json
 import os
 from typing import Any, Dict, Optional
 
 import numpy as np
+import orjson
 from torch.utils.data import Dataset
 
 from streaming.base.array import Array
@@ -32,7 +32,8 @@ class LocalDataset(Array, Dataset):
         self.split = split
 
         filename = os.path.join(local, split, get_index_basename())  # pyright: ignore
-        obj = json.load(open(filename))
+        with open(filename, 'rb') as file:
+            obj = orjson.loads(file.read())
         if obj['version'] != 2:
             raise ValueError(
                 f'Unsupported streaming data version: {obj["version"]}. Expected version 2.'
@@ -289,7 +289,9 @@ def download_from_local(remote: str, local: str) -> None:
     local_tmp = f'{local}.tmp'
     if os.path.exists(local_tmp):
         os.remove(local_tmp)
-    shutil.copy(remote, local_tmp)
+    # Copy contents only. ``copy`` is ``copyfile`` plus a chmod that would give the cache file the
+    # remote file's permission bits.
+    shutil.copyfile(remote, local_tmp)
     os.rename(local_tmp, local)
 
 
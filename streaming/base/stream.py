@@ -4,22 +4,31 @@
 """A dataset, or sub-dataset if mixing, from which we stream/cache samples."""
 
 import json
+import mmap
 import os
+import random
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import mkdtemp
-from typing import List, Optional, Sequence
+from time import sleep
+from typing import BinaryIO, Iterator, List, Optional, Sequence
 
 import numpy as np
+import orjson
 from numpy.typing import NDArray
 from typing_extensions import Self
 
-from streaming.base.compression import decompress
-from streaming.base.constant import TICK
+from streaming.base.compression import decompress, decompress_chunks, is_incremental
+from streaming.base.constant import (DOWNLOAD_BACKOFF_BASE, DOWNLOAD_BACKOFF_MAX, FILE_CHUNK_SIZE,
+                                     TICK)
 from streaming.base.format import FileInfo, Reader, get_index_basename, reader_from_json
-from streaming.base.hashing import get_hash
+from streaming.base.hashing import get_file_hash, get_hasher
 from streaming.base.storage import download_file
 from streaming.base.util import wait_for_file_to_exist
 from streaming.base.world import World
 
+# Jitters download retry backoff, apart from the global ``random`` state that users may seed.
+_backoff_rng = random.Random()
+
 
 class Stream:
     """A dataset, or sub-dataset if mixing, from which we stream/cache samples.
@@ -84,6 +93,11 @@ class Stream:
             Defaults to ``None``.
     """
 
+    __slots__ = ('remote', '_local', 'local', 'split', 'remote_dirname', 'local_dirname',
+                 'proportion', 'repeat', 'choose', '_download_retry', 'download_retry',
+                 '_download_timeout', 'download_timeout', 'validate_hash', '_keep_zip', 'keep_zip',
+                 'safe_keep_zip')
+
     def __init__(self,
                  *,
                  remote: Optional[str] = None,
@@ -100,6 +114,7 @@ class Stream:
         self._local = local
         self.local = local or mkdtemp()
         self.split = split or ''
+        self._init_dirnames()
 
         has_proportion = proportion is not None
         has_repeat = repeat is not None
@@ -108,23 +123,18 @@ class Stream:
             raise ValueError('At most one of `proportion`, `repeat`, and `choose` may be ' +
                              'specified; the others are derived')
 
-        self._proportion = proportion
-        if proportion is not None:
-            if proportion < 0:
-                raise ValueError('`proportion` must be non-negative')
-            self.proportion = proportion
+        # Weights are ``None`` until provided here or derived by ``apply_weights``.
+        if proportion is not None and proportion < 0:
+            raise ValueError('`proportion` must be non-negative')
+        self.proportion = proportion
 
-        self._repeat = repeat
-        if repeat is not None:
-            if repeat < 0:
-                raise ValueError('`repeat` must be non-negative')
-            self.repeat = repeat
+        if repeat is not None and repeat < 0:
+            raise ValueError('`repeat` must be non-negative')
+        self.repeat = repeat
 
-        self._choose = choose
-        if choose is not None:
-            if choose < 0:
-                raise ValueError('`choose` must be non-negative')
-            self.choose = choose
+        if choose is not None and choose < 0:
+            raise ValueError('`choose` must be non-negative')
+        self.choose = choose
 
         self._download_retry = download_retry
         if download_retry is not None:
@@ -158,6 +168,7 @@ class Stream:
 
         if not self.split:
             self.split = default.split or ''
+            self._init_dirnames()
         if self._download_retry is None:
             self.download_retry = default.download_retry
         if self._download_timeout is None:
@@ -168,6 +179,14 @@ class Stream:
             self.keep_zip = default.keep_zip
             self.safe_keep_zip = self.keep_zip or self.remote in {None, self.local}
 
+    def _init_dirnames(self) -> None:
+        """Derive the remote and local split dirs, which are joined with every shard basename."""
+        if self.remote is None:
+            self.remote_dirname = None
+        else:
+            self.remote_dirname = os.path.join(self.remote, self.split)
+        self.local_dirname = os.path.join(self.local, self.split)
+
     @classmethod
     def validate_weights(cls, streams: Sequence[Self]) -> bool:
         """Validate stream weights, returning whether relative or absolute weighting was used.
@@ -178,23 +197,27 @@ class Stream:
         Returns:
             bool: Whether streams are weighted relatively (proportionally).
         """
-        # Validate stream weights ("proportion", "repeat", "choose", or none).
-        is_proportional = hasattr(streams[0], 'proportion')
-        for stream_id, stream in enumerate(streams):
-            has_proportion = hasattr(stream, 'proportion')
-            has_repeat = hasattr(stream, 'repeat')
-            has_choose = hasattr(stream, 'choose')
-            if not (0 <= has_proportion + has_repeat + has_choose <= 1):
-                raise ValueError(
-                    f'Streams must provide at most one of `proportion`, `repeat`, or `choose` (error in stream {stream_id})'
-                )
-            if is_proportional != has_proportion:
-                raise ValueError(
-                    (
-                        f'Relative (`proportion`) and absolute (`repeat`, `choose`, none) stream weights are incompatible with each other (error '
-                        + f'in stream {stream_id})'
-                    )
+        # Validate stream weights ("proportion", "repeat", "choose", or none), as columns.
+        num_streams = len(streams)
+        has_proportions = np.fromiter((stream.proportion is not None for stream in streams), bool,
+                                      num_streams)
+        has_repeats = np.fromiter((stream.repeat is not None for stream in streams), bool,
+                                  num_streams)
+        has_chooses = np.fromiter((stream.choose is not None for stream in streams), bool,
+                                  num_streams)
+        num_weights = has_proportions.astype(np.int64) + has_repeats + has_chooses
+        if (stream_ids := np.flatnonzero(1 < num_weights)).size:
+            raise ValueError(
+                f'Streams must provide at most one of `proportion`, `repeat`, or `choose` (error in stream {stream_ids[0]})'
+            )
+        is_proportional = bool(has_proportions[0])
+        if (stream_ids := np.flatnonzero(has_proportions != is_proportional)).size:
+            raise ValueError(
+                (
+                    f'Relative (`proportion`) and absolute (`repeat`, `choose`, none) stream weights are incompatible with each other (error '
+                    + f'in stream {stream_ids[0]})'
                 )
+            )
         return is_proportional
 
     @classmethod
@@ -220,24 +243,28 @@ class Stream:
             proportion_per_stream = np.array([stream.proportion for stream in streams], np.float64)
             proportion_per_stream /= proportion_per_stream.sum()
             choose_per_stream = (choose_per_epoch * proportion_per_stream).astype(np.int64)
-            shortfall = choose_per_epoch - choose_per_stream.sum()
-            rng = np.random.default_rng(seed)
-            indices = rng.choice(len(streams), shortfall, False)
-            choose_per_stream[indices] += 1
+            # Hand out the rounding shortfall to random distinct streams. The draw is kept as is
+            # when needed, so that a given seed keeps mapping to the same mixture.
+            if shortfall := choose_per_epoch - choose_per_stream.sum():
+                rng = np.random.default_rng(seed)
+                indices = rng.choice(len(streams), shortfall, False)
+                choose_per_stream[indices] += 1
             repeat_per_stream = choose_per_stream / samples_per_stream
         else:
             # Absolute.
             if choose_per_epoch:
                 raise ValueError('Only provide `choose` when weighting streams relatively')
-            choose_per_stream = np.zeros(len(streams), np.int64)
-            for stream_id, stream in enumerate(streams):
-                if hasattr(stream, 'repeat'):
-                    choose = int(stream.repeat * samples_per_stream[stream_id])
-                elif hasattr(stream, 'choose'):
-                    choose = stream.choose
-                else:
-                    choose = samples_per_stream[stream_id]
-                choose_per_stream[stream_id] = choose
+            # Gather the weights as columns (NaN/-1 where unset), then pick per stream in one go.
+            repeats = np.array(
+                [np.nan if stream.repeat is None else stream.repeat for stream in streams],
+                np.float64)
+            chooses = np.array(
+                [-1 if stream.choose is None else stream.choose for stream in streams], np.int64)
+            has_repeats = ~np.isnan(repeats)
+            repeat_chooses = (np.where(has_repeats, repeats, 0) * samples_per_stream).astype(
+                np.int64)
+            choose_per_stream = np.where(has_repeats, repeat_chooses,
+                                         np.where(0 <= chooses, chooses, samples_per_stream))
             repeat_per_stream = choose_per_stream / samples_per_stream
             proportion_per_stream = choose_per_stream / choose_per_stream.sum()
             choose_per_epoch = sum(choose_per_stream)
@@ -262,15 +289,21 @@ class Stream:
             str: Local cache filename.
         """
         # Calculate paths.
-        if self.remote is None:
+        if self.remote_dirname is None:
             remote = None
         else:
-            remote = os.path.join(self.remote, self.split, from_basename)
-        local = os.path.join(self.local, self.split, to_basename or from_basename)
+            remote = os.path.join(self.remote_dirname, from_basename)
+        local = os.path.join(self.local_dirname, to_basename or from_basename)
 
         # Attempt to download, possibly repeating on failure.
         errors = []
-        for _ in range(1 + self.download_retry):
+        for attempt in range(1 + self.download_retry):
+            if attempt:
+                # Back off exponentially, with jitter, so that transient failures (eg, throttling)
+                # can clear and concurrent retries do not hit the store in lockstep. This blocks
+                # only the download thread calling it.
+                backoff = min(DOWNLOAD_BACKOFF_MAX, DOWNLOAD_BACKOFF_BASE * 2**(attempt - 1))
+                sleep(backoff * _backoff_rng.uniform(0.5, 1))
             try:
                 download_file(remote, local, self.download_timeout)
             except FileNotFoundError:  # Bubble up file not found error.
@@ -297,19 +330,46 @@ class Stream:
             raw_filename (str): Decompressed filename.
             compression (str, optional): Compression algorithm.
         """
-        # Load compressed.
-        data = open(zip_filename, 'rb').read()
+        validate_hash = self.validate_hash
+        hasher = get_hasher(validate_hash) if validate_hash else None
 
-        # Validate what was downloaded.
-        if self.validate_hash:
-            if get_hash(self.validate_hash, data) != zip_info.hashes[self.validate_hash]:
-                raise ValueError(f'Checksum failure: {zip_filename}')
+        def read_chunks(zip_file: BinaryIO) -> Iterator[bytes]:
+            while chunk := zip_file.read(FILE_CHUNK_SIZE):
+                if hasher:
+                    hasher.update(chunk)
+                yield chunk
 
         # Decompress and save that.
-        data = decompress(compression, data)  # pyright: ignore
         tmp_filename = f'{raw_filename}.tmp'
-        with open(tmp_filename, 'wb') as out:
-            out.write(data)
+        try:
+            with open(zip_filename, 'rb') as zip_file, open(tmp_filename, 'wb') as out:
+                if is_incremental(compression):
+                    # Stream the compressed file through the hasher and the decompressor in one
+                    # pass, so it is never held in memory whole.
+                    for data in decompress_chunks(compression, read_chunks(zip_file)):
+                        out.write(data)
+                else:
+                    # One-shot decompressors get a view of the memory-mapped file, read straight
+                    # from the page cache without first copying it into a bytes object.
+                    with mmap.mmap(zip_file.fileno(), 0, access=mmap.ACCESS_READ) as zip_map:
+                        with memoryview(zip_map) as zip_data:
+                            if hasher:
+                                hasher.update(zip_data)
+                            out.write(decompress(compression, zip_data))
+        except Exception:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+            # Corrupt downloads are reported as such, not as whatever the decompressor made of it.
+            if validate_hash:
+                if get_file_hash(validate_hash, zip_filename) != zip_info.hashes[validate_hash]:
+                    raise ValueError(f'Checksum failure: {zip_filename}')
+            raise
+
+        # Validate what was downloaded.
+        if hasher and validate_hash:
+            if hasher.hexdigest() != zip_info.hashes[validate_hash]:
+                os.remove(tmp_filename)
+                raise ValueError(f'Checksum failure: {zip_filename}')
         os.rename(tmp_filename, raw_filename)
 
         # Maybe remove compressed to save space.
@@ -333,14 +393,14 @@ class Stream:
                 ``None``.
         """
         # If the local raw file already exists, this is a no-op.
-        raw_filename = os.path.join(self.local, self.split, raw_info.basename)
+        raw_filename = os.path.join(self.local_dirname, raw_info.basename)
         if os.path.isfile(raw_filename):
             return
 
         # Is compression used?
         if zip_info:
             # Download the compressed form if missing.
-            zip_filename = os.path.join(self.local, self.split, zip_info.basename)
+            zip_filename = os.path.join(self.local_dirname, zip_info.basename)
             if not os.path.isfile(zip_filename):
                 self._download_file(zip_info.basename)
 
@@ -352,18 +412,31 @@ class Stream:
 
             # Validate if requested.
             if self.validate_hash:
-                data = open(raw_filename, 'rb').read()
-                if get_hash(self.validate_hash, data) != raw_info.hashes[self.validate_hash]:
+                if get_file_hash(self.validate_hash,
+                                 raw_filename) != raw_info.hashes[self.validate_hash]:
                     raise ValueError(f'Checksum failure: {raw_filename}')
 
     def download_shard(self, shard: Reader) -> None:
         """Download the given shard.
 
+        The parts of a split shard are independent of each other, so they are downloaded
+        concurrently (sum of latencies becomes max of latencies).
+
         Args:
             shard (Reader): Which shard.
         """
-        for raw_info, zip_info in shard.file_pairs:
-            self._download_shard_part(raw_info, zip_info, shard.compression)
+        if len(shard.file_pairs) <= 1:
+            for raw_info, zip_info in shard.file_pairs:
+                self._download_shard_part(raw_info, zip_info, shard.compression)
+            return
+
+        with ThreadPoolExecutor(len(shard.file_pairs)) as executor:
+            futures = [
+                executor.submit(self._download_shard_part, raw_info, zip_info, shard.compression)
+                for raw_info, zip_info in shard.file_pairs
+            ]
+            for future in futures:
+                future.result()
 
     def get_shards(self, world: World) -> List[Reader]:
         """Load this Stream's index, retrieving its shard readers.
@@ -376,7 +449,7 @@ class Stream:
         """
         # Download the index.
         basename = get_index_basename()
-        filename = os.path.join(self.local, self.split, basename)  # pyright: ignore
+        filename = os.path.join(self.local_dirname, basename)
         if world.is_local_leader:
             if self.remote:
                 tmp_filename = self._download_file(basename, f'{basename}.tmp')
@@ -394,8 +467,9 @@ class Stream:
 
         # Load the index.
         try:
-            obj = json.load(open(filename))
-        except json.decoder.JSONDecodeError as error:
+            with open(filename, 'rb') as file:
+                obj = orjson.loads(file.read())
+        except json.decoder.JSONDecodeError as error:  # Base class of orjson.JSONDecodeError.
             error.args = (
                 f'Index file at {filename} is empty or corrupted. {error.args[0]}',
             )
@@ -408,12 +482,7 @@ class Stream:
             )
 
         # Initialize shard readers according to the loaded info.
-        shards = []
-        for info in obj['shards']:
-            shard = reader_from_json(self.local, self.split, info)
-            shards.append(shard)
-
-        return shards
+        return [reader_from_json(self.local, self.split, info) for info in obj['shards']]
 
     def init_local_dir(self, shards: List[Reader]) -> List[bool]:
         """Bring a local directory into a consistent state, getting which shards are present.
@@ -424,13 +493,24 @@ class Stream:
         Returns:
             List[bool]: List of whether each stream shard is present.
         """
-        # List the cache directory (so that we hit the filesystem once).
-        local_dirname = os.path.join(self.local, self.split)
+        # List the cache directory (so that we hit the filesystem once). Files are keyed by their
+        # path relative to it, which is how shard basenames are given, so that shards can check
+        # presence without building full paths. Walk it with scandir, whose entries carry their
+        # cached file type.
         listing = set()
-        for dirname, _, subfiles in os.walk(local_dirname):
-            for subfile in subfiles:
-                filename = os.path.join(dirname, subfile)
-                listing.add(filename)
+        dirnames = [(self.local_dirname, '')]
+        while dirnames:
+            dirname, prefix = dirnames.pop()
+            try:
+                entries = os.scandir(dirname)
+            except OSError:  # Like os.walk, skip directories that cannot be listed.
+                continue
+            with entries:
+                for entry in entries:
+                    if not entry.is_dir():
+                        listing.add(prefix + entry.name)
+                    elif not entry.is_symlink():
+                        dirnames.append((entry.path, f'{prefix}{entry.name}/'))
 
         # Determine which shards are present, making local dir consistent.
         are_shards_present = []
@@ -445,5 +525,5 @@ class Stream:
         Returns:
             int: Size in bytes.
         """
-        filename = os.path.join(self.local, self.split, get_index_basename())
+        filename = os.path.join(self.local_dirname, get_index_basename())
         return os.stat(filename).st_size
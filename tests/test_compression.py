@@ -1,6 +1,7 @@
 # Copyright 2023 MosaicML Streaming authors
 # SPDX-License-Identifier: Apache-2.0
 
+import zlib
 from filecmp import dircmp
 from typing import Any, Optional, Tuple, Union
 
@@ -9,7 +10,8 @@ import pytest
 
 from streaming.base import StreamingDataset
 from streaming.base.compression import (Brotli, Bzip2, Gzip, Snappy, Zstandard, compress,
-                                        decompress, get_compression_extension, is_compression)
+                                        decompress, decompress_chunks, get_compression_extension,
+                                        is_compression, is_incremental)
 from tests.common.datasets import SequenceDataset, write_mds_dataset
 
 
@@ -117,6 +119,25 @@ class TestGzip:
         output = gzip.decompress(gzip.compress(data))
         assert output == data
 
+    def test_decomp_multi_member(self):
+        gzip = Gzip()
+        data = gzip.compress(b'Hello ') + gzip.compress(b'World')
+        assert gzip.decompress(data) == b'Hello World'
+
+    def test_decomp_zero_padding(self):
+        gzip = Gzip()
+        data = gzip.compress(b'Hello ') + b'\0' * 3 + gzip.compress(b'World') + b'\0' * 5
+        assert gzip.decompress(data) == b'Hello World'
+        chunks = [data[i:i + 2] for i in range(0, len(data), 2)]
+        assert b''.join(gzip.decompress_chunks(chunks)) == b'Hello World'
+
+    @pytest.mark.parametrize('trailer', [b'xx', b'\0\0x', b'\x1f'])
+    def test_decomp_trailing_garbage(self, trailer: bytes):
+        gzip = Gzip()
+        data = gzip.compress(b'Hello World') + trailer
+        with pytest.raises((zlib.error, EOFError)):
+            gzip.decompress(data)
+
     @pytest.mark.parametrize('data', [100, 1.2, 'bigdata'])
     def test_invalid_data(self, data: Any):
         gzip = Gzip()
@@ -237,6 +258,35 @@ def test_decompress_invalid_compression_algo():
     assert exc_info.match(r'.*is not a supported compression algorithm.*')
 
 
+@pytest.mark.parametrize('algo', [None, 'br', 'bz2', 'gz', 'snappy', 'zstd'])
+def test_decompress_chunks(algo: Optional[str]):
+    data = np.random.randint(0, 4, 1 << 16).astype(np.uint8).tobytes()
+    zip_data = compress(algo, data)
+    chunks = [zip_data[i:i + 1000] for i in range(0, len(zip_data), 1000)]
+    output = b''.join(decompress_chunks(algo, chunks))
+    assert output == data
+
+
+@pytest.mark.parametrize('algo', [None, 'br', 'bz2', 'gz', 'snappy', 'zstd'])
+def test_decompress_memoryview(algo: Optional[str]):
+    data = b'Hello World 789*!' * 10
+    assert decompress(algo, memoryview(compress(algo, data))) == data
+
+
+@pytest.mark.parametrize(('algo', 'expected'), [(None, True), ('br:1', True), ('bz2', True),
+                                                ('gz', True), ('snappy', False),
+                                                ('zstd:7', False)])
+def test_is_incremental(algo: Optional[str], expected: bool):
+    assert is_incremental(algo) is expected
+
+
+@pytest.mark.parametrize('algo', ['br', 'bz2', 'gz'])
+def test_decompress_chunks_truncated(algo: str):
+    zip_data = compress(algo, b'hello' * 100)
+    with pytest.raises(Exception):
+        _ = b''.join(decompress_chunks(algo, [zip_data[:-4]]))
+
+
 def check_for_diff_files(dir: dircmp, compression_ext: Union[None, str]):
     """Check recursively for different files in a dircmp object.
 
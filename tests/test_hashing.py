@@ -1,6 +1,9 @@
 # Copyright 2023 MosaicML Streaming authors
 # SPDX-License-Identifier: Apache-2.0
 
+import os
+from typing import Tuple
+
 import pytest
 
 import streaming.base.hashing as shash
@@ -42,3 +45,29 @@ def test_get_hash(algo_name: str, data: bytes, expected_output: str):
 def test_get_hash_invalid_algo(algo_name: str, data: bytes):
     with pytest.raises(ValueError):
         _ = shash.get_hash(algo_name, data)
+
+
+@pytest.mark.parametrize('algo_name', ['md5', 'sha3_256', 'xxh3_64'])
+def test_get_hasher(algo_name: str):
+    hasher = shash.get_hasher(algo_name)
+    hasher.update(b'hel')
+    hasher.update(b'lo')
+    assert hasher.hexdigest() == shash.get_hash(algo_name, b'hello')
+
+
+def test_get_hasher_invalid_algo():
+    with pytest.raises(ValueError):
+        _ = shash.get_hasher('sha3')
+
+
+@pytest.mark.usefixtures('local_remote_dir')
+@pytest.mark.parametrize('data', [b'', b'hello', bytes(range(256)) * 256],
+                         ids=['empty', 'small', 'large'])
+@pytest.mark.parametrize('algo_name', ['md5', 'sha3_256', 'xxh3_64'])
+def test_get_file_hash(local_remote_dir: Tuple[str, str], algo_name: str, data: bytes):
+    local, _ = local_remote_dir
+    os.makedirs(local)
+    filename = os.path.join(local, 'file.bin')
+    with open(filename, 'wb') as out:
+        out.write(data)
+    assert shash.get_file_hash(algo_name, filename) == shash.get_hash(algo_name, data)
@@ -0,0 +1,208 @@
+# Copyright 2023 MosaicML Streaming authors
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import random
+import shutil
+from typing import Any, List, Tuple
+from unittest.mock import patch
+
+import pytest
+
+from streaming import JSONWriter, MDSWriter, Stream
+from streaming.base.compression import decompress
+from streaming.base.constant import DOWNLOAD_BACKOFF_BASE, DOWNLOAD_BACKOFF_MAX
+from streaming.base.world import World
+
+
+def get_stream(remote: str, local: str, **kwargs: Any) -> Stream:
+    stream = Stream(remote=remote, local=local, **kwargs)
+    default = Stream(local=local, download_retry=0, download_timeout=60, keep_zip=False)
+    stream.apply_default(default)
+    return stream
+
+
+def write_dataset(dirname: str, format: str, compression: str, size_limit: int = 1 << 10) -> None:
+    writer_class = {'json': JSONWriter, 'mds': MDSWriter}[format]
+    with writer_class(out=dirname,
+                      columns={'value': 'int'},
+                      compression=compression,
+                      hashes=['sha1'],
+                      size_limit=size_limit) as out:
+        for value in range(100):
+            out.write({'value': value})
+
+
+def corrupt(filename: str) -> None:
+    with open(filename, 'r+b') as file:
+        file.seek(os.path.getsize(filename) // 2)
+        byte = file.read(1)
+        file.seek(-1, os.SEEK_CUR)
+        file.write(bytes([byte[0] ^ 0xFF]))
+
+
+@pytest.mark.usefixtures('local_remote_dir')
+@pytest.mark.parametrize('format', ['json', 'mds'])
+@pytest.mark.parametrize('compression', ['br', 'bz2', 'gz', 'snappy', 'zstd'])
+@pytest.mark.parametrize('keep_zip', [False, True])
+def test_download_shard_decompress(local_remote_dir: Tuple[str, str], format: str,
+                                   compression: str, keep_zip: bool):
+    local, remote = local_remote_dir
+    write_dataset(remote, format, compression)
+    stream = get_stream(remote, local, validate_hash='sha1', keep_zip=keep_zip)
+    shard = stream.get_shards(World())[0]
+    stream.download_shard(shard)
+    for raw_info, zip_info in shard.file_pairs:
+        raw_filename = os.path.join(local, raw_info.basename)
+        with open(os.path.join(remote, zip_info.basename), 'rb') as zip_file:
+            expected = decompress(compression, zip_file.read())
+        with open(raw_filename, 'rb') as raw_file:
+            assert raw_file.read() == expected
+        assert not os.path.exists(f'{raw_filename}.tmp')
+        assert os.path.exists(os.path.join(local, zip_info.basename)) == keep_zip
+
+
+@pytest.mark.usefixtures('local_remote_dir')
+@pytest.mark.parametrize('format', ['json', 'mds'])
+@pytest.mark.parametrize('compression', ['br', 'bz2', 'gz', 'snappy', 'zstd'])
+def test_download_shard_checksum_failure(local_remote_dir: Tuple[str, str], format: str,
+                                         compression: str):
+    local, remote = local_remote_dir
+    write_dataset(remote, format, compression)
+    stream = get_stream(remote, local, validate_hash='sha1')
+    shard = stream.get_shards(World())[0]
+    raw_info, zip_info = shard.file_pairs[0]
+    corrupt(os.path.join(remote, zip_info.basename))
+    with pytest.raises(ValueError, match='Checksum failure'):
+        stream.download_shard(shard)
+    raw_filename = os.path.join(local, raw_info.basename)
+    assert not os.path.exists(raw_filename)
+    assert not os.path.exists(f'{raw_filename}.tmp')
+
+
+@pytest.mark.usefixtures('local_remote_dir')
+@pytest.mark.parametrize('compression', ['br', 'gz', 'zstd'])
+def test_download_shard_hash_mismatch(local_remote_dir: Tuple[str, str], compression: str):
+    local, remote = local_remote_dir
+    write_dataset(remote, 'mds', compression)
+    stream = get_stream(remote, local, validate_hash='sha1')
+    shard = stream.get_shards(World())[0]
+    raw_info, zip_info = shard.file_pairs[0]
+    zip_info.hashes['sha1'] = '0' * 40
+    with pytest.raises(ValueError, match='Checksum failure'):
+        stream.download_shard(shard)
+    raw_filename = os.path.join(local, raw_info.basename)
+    assert not os.path.exists(raw_filename)
+    assert not os.path.exists(f'{raw_filename}.tmp')
+
+
+@pytest.mark.usefixtures('local_remote_dir')
+@pytest.mark.parametrize('compression', ['br', 'bz2', 'gz'])
+def test_download_shard_corrupt_unvalidated(local_remote_dir: Tuple[str, str], compression: str):
+    local, remote = local_remote_dir
+    write_dataset(remote, 'mds', compression)
+    stream = get_stream(remote, local)
+    shard = stream.get_shards(World())[0]
+    raw_info, zip_info = shard.file_pairs[0]
+    corrupt(os.path.join(remote, zip_info.basename))
+    with pytest.raises(Exception) as exc_info:
+        stream.download_shard(shard)
+    assert 'Checksum failure' not in str(exc_info.value)
+    assert not os.path.exists(os.path.join(local, f'{raw_info.basename}.tmp'))
+
+
+@pytest.mark.usefixtures('local_remote_dir')
+def test_download_shard_split_parts(local_remote_dir: Tuple[str, str]):
+    local, remote = local_remote_dir
+    write_dataset(remote, 'json', 'zstd')
+    stream = get_stream(remote, local, validate_hash='sha1')
+    shard = stream.get_shards(World())[0]
+    assert len(shard.file_pairs) == 2
+    stream.download_shard(shard)
+    for raw_info, _ in shard.file_pairs:
+        assert os.path.isfile(os.path.join(local, raw_info.basename))
+
+
+@pytest.mark.usefixtures('local_remote_dir')
+def test_download_shard_split_part_failure(local_remote_dir: Tuple[str, str]):
+    local, remote = local_remote_dir
+    write_dataset(remote, 'json', 'zstd')
+    stream = get_stream(remote, local, validate_hash='sha1')
+    shard = stream.get_shards(World())[0]
+    (_, zip_data), (raw_meta, _) = shard.file_pairs
+    os.remove(os.path.join(remote, zip_data.basename))
+    with pytest.raises(FileNotFoundError):
+        stream.download_shard(shard)
+    assert os.path.isfile(os.path.join(local, raw_meta.basename))
+
+
+@pytest.mark.usefixtures('local_remote_dir')
+def test_init_local_dir(local_remote_dir: Tuple[str, str]):
+    local, remote = local_remote_dir
+    write_dataset(os.path.join(remote, 'train'), 'json', 'zstd', 1 << 8)
+    stream = get_stream(remote, local, split='train')
+    shards = stream.get_shards(World())
+    assert len(shards) >= 4
+    local_dirname = os.path.join(local, 'train')
+    for shard in shards[:2]:
+        stream.download_shard(shard)
+
+    # Shard 1: partial raw.
+    (raw_data, _), (raw_meta, _) = shards[1].file_pairs
+    os.remove(os.path.join(local_dirname, raw_meta.basename))
+
+    # Shard 2: zip only, which is not kept.
+    for _, zip_info in shards[2].file_pairs:
+        shutil.copy(os.path.join(remote, 'train', zip_info.basename), local_dirname)
+
+    # Shard 3: raw data under a subdirectory, so listed as a different relative path.
+    (raw_data_3, _), (raw_meta_3, _) = shards[3].file_pairs
+    os.makedirs(os.path.join(local_dirname, 'sub'))
+    open(os.path.join(local_dirname, 'sub', raw_data_3.basename), 'wb').close()
+    open(os.path.join(local_dirname, raw_meta_3.basename), 'wb').close()
+
+    # A symlinked dir is not descended into, so this loop is not walked.
+    os.symlink(local_dirname, os.path.join(local_dirname, 'loop'))
+
+    are_shards_present = stream.init_local_dir(shards)
+    assert are_shards_present == [True, False, False, False] + [False] * (len(shards) - 4)
+    for raw_info, _ in shards[0].file_pairs:
+        assert os.path.isfile(os.path.join(local_dirname, raw_info.basename))
+    assert not os.path.exists(os.path.join(local_dirname, raw_data.basename))
+    for _, zip_info in shards[2].file_pairs:
+        assert not os.path.exists(os.path.join(local_dirname, zip_info.basename))
+    assert os.path.isfile(os.path.join(local_dirname, 'sub', raw_data_3.basename))
+    assert not os.path.exists(os.path.join(local_dirname, raw_meta_3.basename))
+
+
+@pytest.mark.usefixtures('local_remote_dir')
+@pytest.mark.parametrize('num_failures', [0, 3, 8])
+def test_download_file_backoff(local_remote_dir: Tuple[str, str], num_failures: int):
+    local, remote = local_remote_dir
+    download_retry = 7
+    stream = get_stream(remote, local, download_retry=download_retry)
+    attempts = []
+
+    def download_file(*args: Any) -> None:
+        attempts.append(args)
+        if len(attempts) <= num_failures:
+            raise OSError('Transient failure')
+
+    delays: List[float] = []
+    random.seed(42)
+    with patch('streaming.base.stream.download_file', download_file), \
+            patch('streaming.base.stream.sleep', delays.append):
+        if download_retry < num_failures:
+            with pytest.raises(RuntimeError, match='Tried 8 times'):
+                stream._download_file('shard.00000.mds')
+        else:
+            assert stream._download_file('shard.00000.mds') == os.path.join(
+                local, 'shard.00000.mds')
+    assert random.random() == random.Random(42).random()
+
+    num_attempts = min(num_failures, download_retry) + 1
+    assert len(attempts) == num_attempts
+    assert len(delays) == num_attempts - 1
+    for attempt, delay in enumerate(delays, 1):
+        backoff = min(DOWNLOAD_BACKOFF_MAX, DOWNLOAD_BACKOFF_BASE * 2**(attempt - 1))
+        assert backoff / 2 <= delay <= backoff